@@ -19,8 +19,10 @@
 """Finds rhyming phrases of the form "the disput in Beirut".
 
 """
+from .templates import PhraseTemplate
+from .templates import Rhyme
+from .templates import Slot
 from .thesaurus import all_synonyms
-from .rhymes import rhyming_pairs
 
 #: The location of the thesaurus index file.
 THESAURUS_INDEX = 'data/th_en_US_v2.idx'
@@ -53,10 +55,13 @@ def main():
     cities = set(all_cities(CITIES_FILE))
 
     # Get each (battle, city) rhyming pair.
-    pairs = rhyming_pairs(synonyms, cities)
+    template = PhraseTemplate('the {battle} in {city}',
+                              [Slot('battle', synonyms), Slot('city', cities)],
+                              [Rhyme('battle', 'city')])
 
-    for word, city in pairs:
-        print('the {} in {}'.format(word, city.capitalize()))
+    for assignment in template.assignments():
+        assignment['city'] = assignment['city'].capitalize()
+        print(template.format_string.format(**assignment))
 
 
 if __name__ == '__main__':
@@ -17,14 +17,30 @@
 # You should have received a copy of the GNU General Public License along with
 # rumbleinthejungle.  If not, see <http://www.gnu.org/licenses/>.
 """Classes representing a rhyming dictionary."""
+from types import MappingProxyType
+
 import pronouncing
 
 __all__ = (
     'BipartiteRhymingDictionary',
     'rhyming_pairs',
+    'rhyming_parts',
 )
 
 
+def rhyming_parts(word):
+    """Return the set of rhyming parts of the pronunciations of a word.
+
+    Each rhyming part is a string, as computed by
+    :func:`pronouncing.rhyming_part`, for one of the pronunciations of
+    `word` in the Carnegie Mellon University Pronouncing Dictionary. Two
+    words rhyme if their sets of rhyming parts intersect.
+
+    """
+    phones = pronouncing.phones_for_word(word)
+    return set(map(pronouncing.rhyming_part, phones))
+
+
 class BipartiteRhymingDictionary:
     """A rhyming dictionary with left and right word sets.
 
@@ -70,8 +86,7 @@ class BipartiteRhymingDictionary:
 
         """
         for word in words:
-            phones = pronouncing.phones_for_word(word)
-            yield word, set(map(pronouncing.rhyming_part, phones))
+            yield word, rhyming_parts(word)
 
     def __init__(self, words1, words2):
 
@@ -81,6 +96,22 @@ class BipartiteRhymingDictionary:
         #: The rhyming part of each pronunciation of each word on the right.
         self._right = dict(BipartiteRhymingDictionary._rhyming_parts(words2))
 
+    @property
+    def left_rhyming_parts(self):
+        """A read-only mapping from each word on the left to its rhyming
+        parts, as computed by :func:`rhyming_parts`.
+
+        """
+        return MappingProxyType(self._left)
+
+    @property
+    def right_rhyming_parts(self):
+        """A read-only mapping from each word on the right to its rhyming
+        parts, as computed by :func:`rhyming_parts`.
+
+        """
+        return MappingProxyType(self._right)
+
     def is_rhyme(self, word1, word2):
         """Decide whether the two words rhyme.
 
@@ -0,0 +1,265 @@
+# snapshot.py - shared, read-only snapshots of the rhyming dictionary
+#
+# Copyright 2014, 2017 Jeffrey Finkelstein.
+#
+# This file is part of rumbleinthejungle.
+#
+# rumbleinthejungle is free software: you can redistribute it and/or modify it
+# under the terms of the GNU General Public License as published by the Free
+# Software Foundation, either version 3 of the License, or (at your option) any
+# later version.
+#
+# rumbleinthejungle is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or
+# FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General Public License for
+# more details.
+#
+# You should have received a copy of the GNU General Public License along with
+# rumbleinthejungle.  If not, see <http://www.gnu.org/licenses/>.
+"""Classes and functions for sharing a built rhyming dictionary.
+
+A snapshot is a file containing the fully built state of a
+:class:`.BipartiteRhymingDictionary` together with a set of synonyms. It
+is read through a read-only memory map, so any number of processes may
+open the same snapshot and share its physical pages instead of each
+building or unpickling its own copy.
+
+"""
+from array import array
+import mmap
+import os
+import struct
+import tempfile
+
+__all__ = (
+    'RhymingSnapshot',
+    'write_snapshot',
+)
+
+#: Identifies a snapshot file and the byte order in which it was written.
+MAGIC = 0x4A544952
+
+#: The version of the snapshot file format.
+VERSION = 1
+
+#: The format of the snapshot header: the magic number, the version, and
+#: the location of each of the six sections of the file.
+HEADER = struct.Struct('=8I')
+
+#: The size, in bytes, of each unsigned integer in the snapshot.
+ITEMSIZE = 4
+
+
+def _table(items):
+    """Return the bytes of a section of a snapshot file.
+
+    `items` is a list of either :class:`bytes` objects or lists of
+    unsigned integers. A section comprises the number of items, the
+    location of the start of each item and of the end of the last item
+    in the payload, and the payload itself, padded to a multiple of
+    :data:`ITEMSIZE` bytes. The locations are in bytes for a table of
+    strings and in number of integers for a table of integer lists.
+
+    """
+    offsets = array('I', [0])
+    if items and isinstance(items[0], bytes):
+        payload = b''.join(items)
+    else:
+        payload = array('I', [n for item in items for n in item]).tobytes()
+    for item in items:
+        offsets.append(offsets[-1] + len(item))
+    padding = b'\0' * (-len(payload) % ITEMSIZE)
+    return (array('I', [len(items)]).tobytes() + offsets.tobytes() + payload
+            + padding)
+
+
+def write_snapshot(filename, rdict, synonyms=()):
+    """Write a snapshot of a rhyming dictionary and a set of synonyms.
+
+    `filename` is the location of the snapshot file to create, `rdict`
+    is a :class:`.BipartiteRhymingDictionary`, and `synonyms` is an
+    iterable of strings.
+
+    The snapshot is written in the native byte order of this machine,
+    and can be read by :class:`RhymingSnapshot` on machines with the
+    same byte order.
+
+    If `filename` already exists, it is replaced atomically. Any
+    :class:`RhymingSnapshot` that already has the old file open keeps
+    reading the old file.
+
+    """
+    left = rdict.left_rhyming_parts
+    right = rdict.right_rhyming_parts
+    parts = sorted(set().union(*left.values(), *right.values()))
+    ids = {part: n for n, part in enumerate(parts)}
+    sections = [_table([part.encode('utf-8') for part in parts])]
+    for words in (left, right):
+        keys = sorted(words, key=lambda word: word.encode('utf-8'))
+        sections.append(_table([word.encode('utf-8') for word in keys]))
+        sections.append(_table([sorted(ids[part] for part in words[word])
+                                for word in keys]))
+    synonyms = sorted({word.encode('utf-8') for word in synonyms})
+    sections.append(_table(synonyms))
+    offsets = []
+    position = HEADER.size
+    for section in sections:
+        offsets.append(position)
+        position += len(section)
+    # Write to a new file and move it into place, so that processes that have
+    # already opened a snapshot at `filename` keep reading the old file
+    # instead of seeing it change (or shrink) underneath their memory maps.
+    directory = os.path.dirname(os.path.abspath(filename))
+    fd, temporary = tempfile.mkstemp(dir=directory)
+    try:
+        # The temporary file is only readable by its owner, but the snapshot
+        # is meant to be read by other processes.
+        os.chmod(temporary, 0o644)
+        with os.fdopen(fd, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, VERSION, *offsets))
+            for section in sections:
+                f.write(section)
+        os.replace(temporary, filename)
+    except BaseException:
+        os.remove(temporary)
+        raise
+
+
+class _Table:
+    """A read-only view of one section of a snapshot file.
+
+    `views` is a list to which each :class:`memoryview` created by this
+    object is appended, so that they can all be released before the
+    underlying memory map is closed.
+
+    """
+
+    def __init__(self, buffer, start, views, strings):
+        count, = struct.unpack_from('=I', buffer, start)
+        start += ITEMSIZE
+        end = start + (count + 1) * ITEMSIZE
+        view = memoryview(buffer)
+        views.append(view)
+        self.offsets = view[start:end].cast('I')
+        views.append(self.offsets)
+        payload = view[end:end + self.offsets[count] * (1 if strings
+                                                        else ITEMSIZE)]
+        views.append(payload)
+        if not strings:
+            payload = payload.cast('I')
+            views.append(payload)
+        self.payload = payload
+        self.count = count
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, n):
+        return self.payload[self.offsets[n]:self.offsets[n + 1]]
+
+
+class _StringTable(_Table):
+    """A sorted table of strings in a snapshot file."""
+
+    def __init__(self, buffer, start, views):
+        super().__init__(buffer, start, views, strings=True)
+
+    def __getitem__(self, n):
+        return bytes(super().__getitem__(n)).decode('utf-8')
+
+    def __iter__(self):
+        return (self[n] for n in range(len(self)))
+
+    def __contains__(self, word):
+        return self.index(word) >= 0
+
+    def index(self, word):
+        """Return the position of the given word in the table, or -1."""
+        target = word.encode('utf-8')
+        low, high = 0, len(self)
+        while low < high:
+            middle = (low + high) // 2
+            if bytes(_Table.__getitem__(self, middle)) < target:
+                low = middle + 1
+            else:
+                high = middle
+        if low < len(self) and _Table.__getitem__(self, low) == target:
+            return low
+        return -1
+
+
+class RhymingSnapshot:
+    """A rhyming dictionary and a set of synonyms backed by a snapshot file.
+
+    `filename` is the location of a snapshot file created by
+    :func:`write_snapshot`.
+
+    This class should be used as a context manager, as follows::
+
+        with RhymingSnapshot('snapshot.dat') as snapshot:
+            print(snapshot.is_rhyme('fool', 'pool'))
+
+    The file is read through a read-only memory map and nothing is
+    copied out of it except the words being compared, so processes
+    that open the same snapshot share its physical pages. A snapshot
+    opened before the process forks is shared in the same way by the
+    child processes. Within the context, its methods may also be called
+    from multiple threads at once.
+
+    .. versionadded:: 0.0.2
+
+    """
+    def __init__(self, filename):
+        self.filename = filename
+
+    def __enter__(self):
+        with open(self.filename, 'rb') as f:
+            # An empty file cannot be memory mapped, and is not a snapshot.
+            if os.fstat(f.fileno()).st_size < HEADER.size:
+                raise ValueError('{} is too short to be a snapshot'
+                                 ' file'.format(self.filename))
+            self.buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, *offsets = HEADER.unpack_from(self.buffer)
+        if magic != MAGIC or version != VERSION:
+            self.buffer.close()
+            raise ValueError('{} is not a snapshot file of version {} in'
+                             ' native byte order'.format(self.filename,
+                                                         VERSION))
+        self._views = []
+        parts, left, leftparts, right, rightparts, synonyms = offsets
+        #: The rhyming part of each pronunciation of each word.
+        self.parts = _StringTable(self.buffer, parts, self._views)
+        #: The words on the left.
+        self.left = _StringTable(self.buffer, left, self._views)
+        self._leftparts = _Table(self.buffer, leftparts, self._views, False)
+        #: The words on the right.
+        self.right = _StringTable(self.buffer, right, self._views)
+        self._rightparts = _Table(self.buffer, rightparts, self._views, False)
+        #: The set of synonyms.
+        self.synonyms = _StringTable(self.buffer, synonyms, self._views)
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        # The memory map cannot be closed while any views of it exist.
+        for view in reversed(self._views):
+            view.release()
+        self.buffer.close()
+        # this means do not suppress exceptions raised within the context
+        return False
+
+    def is_rhyme(self, word1, word2):
+        """Decide whether the two words rhyme.
+
+        This method behaves like
+        :meth:`.BipartiteRhymingDictionary.is_rhyme`. `word1` must be a
+        string from the left set and `word2` must be a string from the
+        right set, otherwise this method raises a :exc:`KeyError`.
+
+        """
+        n = self.left.index(word1)
+        if n < 0:
+            raise KeyError(word1)
+        m = self.right.index(word2)
+        if m < 0:
+            raise KeyError(word2)
+        return not set(self._leftparts[n]).isdisjoint(self._rightparts[m])
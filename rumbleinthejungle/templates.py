@@ -0,0 +1,326 @@
+# templates.py - multi-slot phrase templates
+#
+# Copyright 2014, 2017 Jeffrey Finkelstein.
+#
+# This file is part of rumbleinthejungle.
+#
+# rumbleinthejungle is free software: you can redistribute it and/or modify it
+# under the terms of the GNU General Public License as published by the Free
+# Software Foundation, either version 3 of the License, or (at your option) any
+# later version.
+#
+# rumbleinthejungle is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or
+# FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General Public License for
+# more details.
+#
+# You should have received a copy of the GNU General Public License along with
+# rumbleinthejungle.  If not, see <http://www.gnu.org/licenses/>.
+"""Classes representing phrase templates with constrained slots."""
+from abc import ABCMeta
+from abc import abstractmethod
+from collections import Counter
+from collections import defaultdict
+from string import Formatter
+
+import pronouncing
+
+from .rhymes import rhyming_parts
+
+__all__ = (
+    'Alliteration',
+    'Constraint',
+    'PhraseTemplate',
+    'Rhyme',
+    'Slot',
+)
+
+
+class Slot:
+    """A named slot in a phrase template together with its vocabulary.
+
+    `name` is the name of the replacement field in the template format
+    string, and `words` is an iterable of strings that may fill the
+    slot, for example the synonyms yielded by
+    :func:`.thesaurus.all_synonyms` or the lines of a file of city
+    names.
+
+    .. versionadded:: 0.0.2
+
+    """
+
+    def __init__(self, name, words):
+        self.name = name
+        self.words = frozenset(words)
+
+
+class Constraint(metaclass=ABCMeta):
+    """A constraint between the words filling two slots of a template.
+
+    `left` and `right` are the names of the constrained slots, which
+    must be distinct. The words filling the two slots satisfy the
+    constraint if they share at least one key, as computed by the
+    :meth:`keys` method.
+
+    This is an abstract base class; subclasses must implement
+    :meth:`keys`.
+
+    """
+
+    def __init__(self, left, right):
+        self.left = left
+        self.right = right
+
+    @staticmethod
+    @abstractmethod
+    def keys(word):
+        """Return the set of keys of the given word.
+
+        Two words satisfy the constraint if and only if their sets of
+        keys intersect.
+
+        """
+
+
+class Rhyme(Constraint):
+    """Requires the words filling two slots to rhyme.
+
+    As in :class:`.BipartiteRhymingDictionary`, two words rhyme if the
+    rhyming part of any of their pronunciations is the same.
+
+    """
+
+    @staticmethod
+    def keys(word):
+        return frozenset(rhyming_parts(word))
+
+
+class Alliteration(Constraint):
+    """Requires the words filling two slots to alliterate.
+
+    Two words alliterate if any of their pronunciations begin with the
+    same sound, ignoring stress.
+
+    """
+
+    @staticmethod
+    def keys(word):
+        phones = pronouncing.phones_for_word(word)
+        return frozenset(p.split()[0].rstrip('012') for p in phones if p)
+
+
+class PhraseTemplate:
+    """A phrase with named slots, each of which is filled by a word.
+
+    `format_string` is a string suitable for :meth:`str.format` with
+    one named replacement field for each slot, `slots` is an iterable
+    of :class:`Slot` objects, and `constraints` is an iterable of
+    :class:`Rhyme` or :class:`Alliteration` objects relating pairs of
+    slots. For example:
+
+    .. doctest::
+
+       >>> slots = [Slot('battle', ['fight']), Slot('city', ['white'])]
+       >>> template = PhraseTemplate('the {battle} in {city}', slots,
+       ...                           [Rhyme('battle', 'city')])
+       >>> list(template.phrases())
+       ['the fight in white']
+
+    If two slots in `slots` have the same name, if the format string
+    names a slot that is not given in `slots`, or if a constraint names
+    a slot that is not given in `slots` or relates a slot to itself,
+    this class raises a :exc:`ValueError`.
+
+    Implementation notes: the phrases are found by a sequence of hash
+    joins, one slot at a time. For each constraint, the words of each
+    of its slots are grouped into buckets by key. Before joining, each
+    vocabulary is reduced to those words that share a key with some
+    word in the vocabulary of every slot they are constrained with. The
+    order of the joins is then chosen by :meth:`plan` so that the most
+    selective slots are filled first, which prunes partial phrases that
+    cannot be completed before they are extended.
+
+    .. versionadded:: 0.0.2
+
+    """
+
+    def __init__(self, format_string, slots, constraints=()):
+        self.format_string = format_string
+        self.slots = {}
+        for slot in slots:
+            if slot.name in self.slots:
+                raise ValueError('duplicate slot named {}'.format(slot.name))
+            self.slots[slot.name] = slot
+        self.constraints = list(constraints)
+        fields = {field for _, field, _, _ in Formatter().parse(format_string)
+                  if field is not None}
+        for name in fields:
+            if name not in self.slots:
+                raise ValueError('no slot named {}'.format(name))
+        for constraint in self.constraints:
+            for name in (constraint.left, constraint.right):
+                if name not in self.slots:
+                    raise ValueError('no slot named {}'.format(name))
+            if constraint.left == constraint.right:
+                raise ValueError('constraint relates slot {} to'
+                                 ' itself'.format(constraint.left))
+
+        #: The keys of each word, by constraint type and slot name.
+        self._keys = {}
+        for constraint in self.constraints:
+            for name in (constraint.left, constraint.right):
+                kind = type(constraint)
+                if (kind, name) not in self._keys:
+                    self._keys[kind, name] = {
+                        word: kind.keys(word)
+                        for word in self.slots[name].words
+                    }
+
+        #: The words with each key, by constraint type and slot name.
+        self._buckets = {}
+        for (kind, name), keys in self._keys.items():
+            buckets = defaultdict(set)
+            for word, wordkeys in keys.items():
+                for key in wordkeys:
+                    buckets[key].add(word)
+            self._buckets[kind, name] = buckets
+
+    def _links(self, name):
+        """Yield each constraint on the named slot and the other slot."""
+        for constraint in self.constraints:
+            if constraint.left == name:
+                yield constraint, constraint.right
+            elif constraint.right == name:
+                yield constraint, constraint.left
+
+    def _vocabularies(self):
+        """Return the vocabulary of each slot reduced by the constraints.
+
+        A word is removed from the vocabulary of a slot if it shares no
+        key with any word remaining in the vocabulary of some slot with
+        which it is constrained. This is repeated until no more words
+        can be removed.
+
+        """
+        vocabularies = {name: set(slot.words)
+                        for name, slot in self.slots.items()}
+        changed = True
+        while changed:
+            changed = False
+            for name, vocabulary in vocabularies.items():
+                for constraint, other in self._links(name):
+                    kind = type(constraint)
+                    otherkeys = self._keys[kind, other]
+                    live = set()
+                    for word in vocabularies[other]:
+                        live |= otherkeys[word]
+                    keys = self._keys[kind, name]
+                    dead = {word for word in vocabulary
+                            if not keys[word] & live}
+                    if dead:
+                        vocabulary -= dead
+                        changed = True
+        return vocabularies
+
+    def _selectivity(self, constraint, vocabularies):
+        """Estimate the fraction of pairs of words satisfying the constraint.
+
+        The estimate is computed from the sizes of the buckets of each
+        key among the words in `vocabularies`.
+
+        """
+        kind = type(constraint)
+        sizes = []
+        for name in (constraint.left, constraint.right):
+            keys = self._keys[kind, name]
+            sizes.append(Counter(key for word in vocabularies[name]
+                                 for key in keys[word]))
+        left, right = sizes
+        pairs = sum(n * right[key] for key, n in left.items())
+        total = (len(vocabularies[constraint.left])
+                 * len(vocabularies[constraint.right]))
+        return min(1, pairs / total) if total else 0
+
+    def plan(self, vocabularies=None):
+        """Return the list of slot names in the order they will be filled.
+
+        `vocabularies` is a dictionary mapping slot name to the set of
+        words that may fill that slot; if it is not specified, the
+        vocabularies of the slots reduced by the constraints are used.
+
+        The slots are ordered greedily. At each step, the slot with the
+        fewest estimated ways of extending the partial phrase built so
+        far is chosen next. The estimate is the size of the vocabulary
+        of the slot times the selectivity of each constraint between
+        the slot and the slots already chosen, assuming the constraints
+        are independent. Ties are broken by the order in which the
+        slots were given.
+
+        """
+        if vocabularies is None:
+            vocabularies = self._vocabularies()
+        selectivities = [self._selectivity(constraint, vocabularies)
+                         for constraint in self.constraints]
+        order = []
+        remaining = list(self.slots)
+        while remaining:
+            def cost(name):
+                result = len(vocabularies[name])
+                for constraint, selectivity in zip(self.constraints,
+                                                   selectivities):
+                    if constraint.left == name and constraint.right in order:
+                        result *= selectivity
+                    elif constraint.right == name and constraint.left in order:
+                        result *= selectivity
+                return result
+            name = min(remaining, key=cost)
+            order.append(name)
+            remaining.remove(name)
+        return order
+
+    def _fill(self, assignment, order, vocabularies):
+        """Yield each complete assignment that extends the given one."""
+        if len(assignment) == len(order):
+            yield dict(assignment)
+            return
+        name = order[len(assignment)]
+        candidates = vocabularies[name]
+        for constraint, other in self._links(name):
+            if other not in assignment:
+                continue
+            kind = type(constraint)
+            buckets = self._buckets[kind, name]
+            matches = set()
+            for key in self._keys[kind, other][assignment[other]]:
+                matches |= buckets.get(key, set())
+            candidates = candidates & matches
+            if not candidates:
+                return
+        for word in candidates:
+            assignment[name] = word
+            yield from self._fill(assignment, order, vocabularies)
+        assignment.pop(name, None)
+
+    def assignments(self):
+        """Yield each assignment of words to slots satisfying the constraints.
+
+        This method is an iterator generator that yields dictionaries
+        mapping slot name to word.
+
+        """
+        vocabularies = self._vocabularies()
+        if not all(vocabularies.values()):
+            return
+        order = self.plan(vocabularies)
+        yield from self._fill({}, order, vocabularies)
+
+    def phrases(self):
+        """Yield each phrase whose words satisfy the constraints.
+
+        This method is an iterator generator that yields the format
+        string with each slot replaced by a word, as given by
+        :meth:`assignments`.
+
+        """
+        for assignment in self.assignments():
+            yield self.format_string.format(**assignment)
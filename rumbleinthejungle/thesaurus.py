@@ -18,6 +18,8 @@
 # rumbleinthejungle.  If not, see <http://www.gnu.org/licenses/>.
 """Classes and functions for finding synonyms."""
 import logging
+import mmap
+import threading
 
 __all__ = (
     'all_synonyms',
@@ -29,6 +31,23 @@ __all__ = (
 ALL_PARTS_OF_SPEECH = frozenset({'adj', 'noun', 'verb', 'adv'})
 
 
+def _readline(buffer, position):
+    """Return the line starting at `position` and the position after it.
+
+    `buffer` is a bytes-like object, such as a :class:`mmap.mmap`. The
+    returned line includes its trailing newline, if any; at the end of
+    the buffer, it is empty.
+
+    Unlike :meth:`io.IOBase.readline`, this function does not depend on
+    or change the stream position of a file, so it may be called from
+    many threads at once on the same buffer.
+
+    """
+    end = buffer.find(b'\n', position)
+    end = len(buffer) if end < 0 else end + 1
+    return buffer[position:end], end
+
+
 class ThesaurusIndex:
     """Represents an index indicating the location of each word in the
     thesaurus.
@@ -49,23 +68,32 @@ class ThesaurusIndex:
                 Thesaurus('mythesaurus.txt', index) as thesaurus:
             print(thesaurus.synonyms('cool'))
 
+    Within the context, :meth:`byte_offset` may be called from multiple
+    threads at once. The index file is read through a read-only memory
+    map, and the offsets read so far are cached in a dictionary that is
+    only modified while holding a lock.
+
     """
     def __init__(self, filename):
         self.filename = filename
 
     def __enter__(self):
         self.offsets = {}
-        self.fd = open(self.filename)
-        encoding = self.fd.readline()
-        logging.debug('Ignoring encoding %s', encoding)
+        self.lock = threading.Lock()
+        with open(self.filename, 'rb') as f:
+            self.buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        encoding, position = _readline(self.buffer, 0)
+        self.encoding = encoding.decode('ascii').strip()
         # TODO we could use this for a binary search instead but it would be
         # even *more* complicated.
-        number_of_entries = self.fd.readline()
+        number_of_entries, position = _readline(self.buffer, position)
         logging.debug('Ignoring number of entries %s', number_of_entries)
+        #: The location of the first index entry not yet read into the cache.
+        self.position = position
         return self
 
     def __exit__(self, exc_type, exc_val, exc_tb):
-        self.fd.close()
+        self.buffer.close()
         # this means do not suppress exceptions raised within the context
         return False
 
@@ -77,28 +105,35 @@ class ThesaurusIndex:
 
         """
         # Check if the target has already been read on a previous call to this
-        # method.
-        if target in self.offsets:
-            return self.offsets[target]
-        # Read one line at a time, looking for the target, and reading
-        line = self.fd.readline()
-        while line is not None:
-            entry, offset = line.split('|')
-            # Record the byte offset for this entry.
-            self.offsets[entry] = int(offset)
-            # If we have passed the target, we know it doesn't exist in the
-            # list further down, since the index is in lexicographic order, so
-            # we can immediately break from the loop (and hence return -1).
-            if entry > target:
-                break
-            # If we found a match, immediately return the offset
-            if entry == target:
-                return int(offset)
-            # Otherwise, continue the search.
-            line = self.fd.readline()
-        # Otherwise, we have reached the end of the file somehow without
-        # finding the entry but also without having returned -1, so we'll
-        # return -1 here just to be safe.
+        # method. Reading from the dictionary without the lock is safe because
+        # entries are only ever added, never changed or removed.
+        offset = self.offsets.get(target)
+        if offset is not None:
+            return offset
+        with self.lock:
+            # Another thread may have read the target while we were waiting.
+            if target in self.offsets:
+                return self.offsets[target]
+            # Read one line at a time, looking for the target, and reading
+            line, position = _readline(self.buffer, self.position)
+            while line:
+                entry, offset = line.decode(self.encoding).split('|')
+                # Record the byte offset for this entry.
+                self.offsets[entry] = int(offset)
+                self.position = position
+                # If we have passed the target, we know it doesn't exist in
+                # the list further down, since the index is in lexicographic
+                # order, so we can immediately break from the loop (and hence
+                # return -1).
+                if entry > target:
+                    break
+                # If we found a match, immediately return the offset
+                if entry == target:
+                    return int(offset)
+                # Otherwise, continue the search.
+                line, position = _readline(self.buffer, self.position)
+        # Otherwise, we have reached the end of the file without finding the
+        # entry, so we return -1.
         return -1
 
 
@@ -116,20 +151,24 @@ class Thesaurus:
                 Thesaurus('mythesaurus.txt', index) as thesaurus:
             print(thesaurus.synonyms('cool'))
 
+    Within the context, :meth:`synonyms` may be called from multiple
+    threads at once. The thesaurus file is read through a read-only
+    memory map, so lookups never share a stream position.
+
     """
     def __init__(self, filename, index):
         self.filename = filename
         self.index = index
 
     def __enter__(self):
-        self.offsets = {}
-        self.fd = open(self.filename)
-        encoding = self.fd.readline()
-        logging.debug('Ignoring encoding %s', encoding)
+        with open(self.filename, 'rb') as f:
+            self.buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        encoding, _ = _readline(self.buffer, 0)
+        self.encoding = encoding.decode('ascii').strip()
         return self
 
     def __exit__(self, exc_type, exc_val, exc_tb):
-        self.fd.close()
+        self.buffer.close()
         # this means do not suppress exceptions raised within the context
         return False
 
@@ -146,14 +185,14 @@ class Thesaurus:
         # Get the offset of the word in the index according to the
         # ThesaurusIndex object provided at instantiation.
         offset = self.index.byte_offset(word)
-        # Set the stream position to the specified byte offset.
-        self.fd.seek(offset)
         # Read the first line to determine how many lines should be read next.
-        entry, num_meanings = self.fd.readline().split('|')
+        line, position = _readline(self.buffer, offset)
+        entry, num_meanings = line.decode(self.encoding).split('|')
         # Iterate over each meaning and get all synonyms.
         result = set()
         for n in range(int(num_meanings)):
-            parts = self.fd.readline().strip().split('|')
+            line, position = _readline(self.buffer, position)
+            parts = line.decode(self.encoding).strip().split('|')
             pos = parts[0][1:-1]
             if pos not in parts_of_speech:
                 continue
@@ -19,7 +19,7 @@
 """Unit tests for :mod:`rumbleinthejungle`."""
 import unittest
 
-from rumbleinthejungle.__main__ import rhyming_pairs
+from rumbleinthejungle.rhymes import rhyming_pairs
 
 
 class TestRhymingPairs(unittest.TestCase):
@@ -0,0 +1,110 @@
+# test_snapshot.py - unit tests for rhyming dictionary snapshots
+#
+# Copyright 2014, 2017 Jeffrey Finkelstein.
+#
+# This file is part of rumbleinthejungle.
+#
+# rumbleinthejungle is free software: you can redistribute it and/or modify it
+# under the terms of the GNU General Public License as published by the Free
+# Software Foundation, either version 3 of the License, or (at your option) any
+# later version.
+#
+# rumbleinthejungle is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or
+# FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General Public License for
+# more details.
+#
+# You should have received a copy of the GNU General Public License along with
+# rumbleinthejungle.  If not, see <http://www.gnu.org/licenses/>.
+"""Unit tests for the rhyming dictionary snapshot."""
+from multiprocessing import Pool
+import os
+import tempfile
+import unittest
+
+from rumbleinthejungle.rhymes import BipartiteRhymingDictionary
+from rumbleinthejungle.snapshot import RhymingSnapshot
+from rumbleinthejungle.snapshot import write_snapshot
+
+LEFT = ['bickering', 'fight', 'tiff', 'brawl', 'toss out', 'café']
+
+RIGHT = ['pickering', 'flickering', 'white', 'hall', 'paris', 'beirut']
+
+SYNONYMS = {'fight', 'battle', 'struggle', 'tiff', 'dispute'}
+
+
+def _rhymes(filename):
+    """Return each rhyming pair of words in the given snapshot."""
+    with RhymingSnapshot(filename) as snapshot:
+        return {(word1, word2) for word1 in LEFT for word2 in RIGHT
+                if snapshot.is_rhyme(word1, word2)}
+
+
+class TestRhymingSnapshot(unittest.TestCase):
+
+    def setUp(self):
+        self.rdict = BipartiteRhymingDictionary(LEFT, RIGHT)
+        fd, self.filename = tempfile.mkstemp()
+        os.close(fd)
+        write_snapshot(self.filename, self.rdict, SYNONYMS)
+
+    def tearDown(self):
+        os.remove(self.filename)
+
+    def test_is_rhyme(self):
+        """Tests that the snapshot agrees with the rhyming dictionary."""
+        with RhymingSnapshot(self.filename) as snapshot:
+            for word1 in LEFT:
+                for word2 in RIGHT:
+                    self.assertEqual(snapshot.is_rhyme(word1, word2),
+                                     self.rdict.is_rhyme(word1, word2))
+
+    def test_unknown_word(self):
+        """Tests that querying a word not in the snapshot raises an exception.
+
+        """
+        with RhymingSnapshot(self.filename) as snapshot:
+            with self.assertRaises(KeyError):
+                snapshot.is_rhyme('fight', 'bickering')
+            with self.assertRaises(KeyError):
+                snapshot.is_rhyme('white', 'fight')
+
+    def test_word_tables(self):
+        """Tests that the word tables and synonym set are stored."""
+        with RhymingSnapshot(self.filename) as snapshot:
+            self.assertEqual(set(snapshot.left), set(LEFT))
+            self.assertEqual(set(snapshot.right), set(RIGHT))
+            self.assertEqual(set(snapshot.synonyms), SYNONYMS)
+            self.assertIn('dispute', snapshot.synonyms)
+            self.assertNotIn('beirut', snapshot.synonyms)
+
+    def test_not_a_snapshot(self):
+        """Tests that opening a file that is not a snapshot raises an
+        exception.
+
+        """
+        for contents in (b'\0' * 64, b'\0' * 8, b''):
+            with open(self.filename, 'wb') as f:
+                f.write(contents)
+            with self.assertRaises(ValueError):
+                with RhymingSnapshot(self.filename):
+                    pass
+
+    def test_rewrite_while_open(self):
+        """Tests that rewriting a snapshot does not affect open snapshots."""
+        with RhymingSnapshot(self.filename) as snapshot:
+            rdict = BipartiteRhymingDictionary(['cat'], ['hat'])
+            write_snapshot(self.filename, rdict)
+            self.assertTrue(snapshot.is_rhyme('fight', 'white'))
+            self.assertIn('dispute', snapshot.synonyms)
+        with RhymingSnapshot(self.filename) as snapshot:
+            self.assertTrue(snapshot.is_rhyme('cat', 'hat'))
+            self.assertEqual(set(snapshot.synonyms), set())
+
+    def test_multiple_processes(self):
+        """Tests that many processes can query the same snapshot."""
+        expected = _rhymes(self.filename)
+        with Pool(4) as pool:
+            results = pool.map(_rhymes, [self.filename] * 8)
+        for actual in results:
+            self.assertEqual(actual, expected)
@@ -0,0 +1,96 @@
+# test_templates.py - unit tests for phrase templates
+#
+# Copyright 2014, 2017 Jeffrey Finkelstein.
+#
+# This file is part of rumbleinthejungle.
+#
+# rumbleinthejungle is free software: you can redistribute it and/or modify it
+# under the terms of the GNU General Public License as published by the Free
+# Software Foundation, either version 3 of the License, or (at your option) any
+# later version.
+#
+# rumbleinthejungle is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or
+# FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General Public License for
+# more details.
+#
+# You should have received a copy of the GNU General Public License along with
+# rumbleinthejungle.  If not, see <http://www.gnu.org/licenses/>.
+"""Unit tests for the phrase template classes."""
+import unittest
+
+from rumbleinthejungle.rhymes import rhyming_pairs
+from rumbleinthejungle.templates import Alliteration
+from rumbleinthejungle.templates import Constraint
+from rumbleinthejungle.templates import PhraseTemplate
+from rumbleinthejungle.templates import Rhyme
+from rumbleinthejungle.templates import Slot
+
+
+class TestPhraseTemplate(unittest.TestCase):
+
+    def test_two_slots(self):
+        """Tests that a two-slot template agrees with :func:`rhyming_pairs`."""
+        left = ['bickering', 'fight', 'tiff']
+        right = ['pickering', 'flickering', 'white', 'paris']
+        template = PhraseTemplate('the {battle} in {city}',
+                                  [Slot('battle', left), Slot('city', right)],
+                                  [Rhyme('battle', 'city')])
+        actual = {(a['battle'], a['city']) for a in template.assignments()}
+        self.assertEqual(actual, set(rhyming_pairs(left, right)))
+
+    def test_three_slots(self):
+        """Tests rhyme and alliteration constraints among three slots."""
+        slots = [Slot('battle', ['fight', 'brawl', 'tiff']),
+                 Slot('city', ['night', 'hall', 'york']),
+                 Slot('country', ['norway', 'hungary', 'haiti'])]
+        constraints = [Rhyme('battle', 'city'),
+                       Alliteration('city', 'country')]
+        template = PhraseTemplate('the {battle} in {city}, {country}', slots,
+                                  constraints)
+        actual = set(template.phrases())
+        expected = {'the fight in night, norway', 'the brawl in hall, hungary',
+                    'the brawl in hall, haiti'}
+        self.assertEqual(actual, expected)
+
+    def test_unconstrained_slot(self):
+        """Tests that a slot with no constraints ranges over its vocabulary."""
+        slots = [Slot('a', ['fight']), Slot('b', ['white']),
+                 Slot('c', ['one', 'two'])]
+        template = PhraseTemplate('{a} {b} {c}', slots, [Rhyme('a', 'b')])
+        actual = set(template.phrases())
+        self.assertEqual(actual, {'fight white one', 'fight white two'})
+
+    def test_no_matches(self):
+        """Tests that unsatisfiable constraints yield no phrases."""
+        slots = [Slot('a', ['fight']), Slot('b', ['paris'])]
+        template = PhraseTemplate('{a} {b}', slots, [Rhyme('a', 'b')])
+        self.assertEqual(list(template.phrases()), [])
+
+    def test_plan(self):
+        """Tests that the most selective slots are joined first."""
+        slots = [Slot('many', ['one', 'two', 'three', 'four', 'five']),
+                 Slot('battle', ['fight', 'brawl']),
+                 Slot('city', ['white', 'hall', 'bright', 'night'])]
+        template = PhraseTemplate('{many} {battle} {city}', slots,
+                                  [Rhyme('battle', 'city')])
+        self.assertEqual(template.plan(), ['battle', 'city', 'many'])
+
+    def test_unknown_slot(self):
+        """Tests that naming an unknown or duplicate slot, or constraining a
+        slot with itself, raises an exception.
+
+        """
+        with self.assertRaises(ValueError):
+            PhraseTemplate('{a} {b}', [Slot('a', ['fight'])])
+        with self.assertRaises(ValueError):
+            PhraseTemplate('{a}', [Slot('a', ['fight'])], [Rhyme('a', 'b')])
+        with self.assertRaises(ValueError):
+            PhraseTemplate('{a}', [Slot('a', ['fight']), Slot('a', ['tiff'])])
+        with self.assertRaises(ValueError):
+            PhraseTemplate('{a}', [Slot('a', ['fight'])], [Rhyme('a', 'a')])
+
+    def test_abstract_constraint(self):
+        """Tests that the constraint base class cannot be instantiated."""
+        with self.assertRaises(TypeError):
+            Constraint('a', 'b')
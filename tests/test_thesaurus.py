@@ -17,6 +17,10 @@
 # You should have received a copy of the GNU General Public License along with
 # rumbleinthejungle.  If not, see <http://www.gnu.org/licenses/>.
 """Unit tests for the thesaurus classes."""
+from concurrent.futures import ThreadPoolExecutor
+import os
+import random
+import tempfile
 import unittest
 
 from rumbleinthejungle.__main__ import THESAURUS_INDEX
@@ -36,6 +40,18 @@ class TestThesaurusIndex(unittest.TestCase):
             assert index.byte_offset('travesty') == 17018737
             assert index.byte_offset('banana') == 1314743
 
+    def test_concurrent_byte_offset(self):
+        """Tests that concurrent lookups agree with single-threaded lookups."""
+        words = ['simple', 'travesty', 'banana', 'junk', 'zymurgy', 'fight',
+                 'battle', 'struggle', 'tiff', 'dispute', 'nonexistentword']
+        with ThesaurusIndex(THESAURUS_INDEX) as index:
+            expected = {word: index.byte_offset(word) for word in words}
+        queries = words * 50
+        random.Random(0).shuffle(queries)
+        with ThesaurusIndex(THESAURUS_INDEX) as index, \
+                ThreadPoolExecutor(max_workers=8) as executor:
+            actual = list(executor.map(index.byte_offset, queries))
+        assert actual == [expected[word] for word in queries]
 
 
 class TestThesaurus(unittest.TestCase):
@@ -51,3 +67,68 @@ class TestThesaurus(unittest.TestCase):
                  'scrap', 'boat', 'trash', 'scrap', 'discard', 'fling', 'toss',
                  'toss out', 'toss away', 'chuck out', 'cast aside', 'dispose',
                  'throw out', 'cast out', 'throw away', 'cast away', 'put away'}
+
+
+#: The entries of a small thesaurus, in the format of the thesaurus data file.
+#: One word is not ASCII, to check that entries are decoded correctly.
+ENTRIES = [
+    ('battle', ['(noun)|conflict|fight|engagement',
+                '(verb)|struggle|fight (similar term)|peace (antonym)']),
+    ('café', ['(noun)|coffeehouse|coffee shop|cafe']),
+    ('junk', ['(noun)|debris|rubble|trash (generic term)',
+              '(verb)|discard|toss out|junk (related term)']),
+    ('tiff', ['(noun)|quarrel|spat']),
+]
+
+
+class TestThesaurusFile(unittest.TestCase):
+    """Tests the thesaurus on small index and data files written by the test.
+
+    """
+
+    def setUp(self):
+        data = ['ISO8859-1\n'.encode('latin-1')]
+        index = ['ISO8859-1\n{}\n'.format(len(ENTRIES)).encode('latin-1')]
+        offset = len(data[0])
+        for word, meanings in ENTRIES:
+            lines = ['{}|{}\n'.format(word, len(meanings))]
+            lines.extend(meaning + '\n' for meaning in meanings)
+            chunk = ''.join(lines).encode('latin-1')
+            index.append('{}|{}\n'.format(word, offset).encode('latin-1'))
+            data.append(chunk)
+            offset += len(chunk)
+        self.filenames = []
+        for chunks in (index, data):
+            fd, filename = tempfile.mkstemp()
+            with os.fdopen(fd, 'wb') as f:
+                f.write(b''.join(chunks))
+            self.filenames.append(filename)
+
+    def tearDown(self):
+        for filename in self.filenames:
+            os.remove(filename)
+
+    def test_synonyms(self):
+        """Tests that synonyms are read from the correct byte offsets."""
+        with ThesaurusIndex(self.filenames[0]) as index, \
+                Thesaurus(self.filenames[1], index) as thesaurus:
+            assert thesaurus.synonyms('junk') == \
+                {'debris', 'rubble', 'trash', 'discard', 'toss out', 'junk'}
+            assert thesaurus.synonyms('battle', {'verb'}) == \
+                {'struggle', 'fight'}
+            assert thesaurus.synonyms('café') == \
+                {'coffeehouse', 'coffee shop', 'cafe'}
+
+    def test_concurrent_synonyms(self):
+        """Tests that concurrent lookups agree with single-threaded lookups."""
+        words = [word for word, meanings in ENTRIES]
+        with ThesaurusIndex(self.filenames[0]) as index, \
+                Thesaurus(self.filenames[1], index) as thesaurus:
+            expected = {word: thesaurus.synonyms(word) for word in words}
+        queries = words * 100
+        random.Random(0).shuffle(queries)
+        with ThesaurusIndex(self.filenames[0]) as index, \
+                Thesaurus(self.filenames[1], index) as thesaurus, \
+                ThreadPoolExecutor(max_workers=8) as executor:
+            actual = list(executor.map(thesaurus.synonyms, queries))
+        assert actual == [expected[word] for word in queries]